@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from src.core.input_inspector import InputInspector
 from src.core.output_inspector import OutputInspector
+from src.core.conversation_inspector import ConversationInspector
 from src.core.decision_hub import DecisionHub
 from src.core.model_engine import ModelEngine
+from src.core.verdict_cache import get_verdict_cache
 
 router = APIRouter()
 
@@ -19,6 +21,17 @@ class OutputInspectRequest(BaseModel):
     text: str
     detection_type: str = "output"
 
+# 会话消息模型
+class ConversationMessage(BaseModel):
+    role: str = "user"
+    content: str
+
+# 会话检测请求模型（messages 为完整历史，服务端仅检测新增轮次）
+class ConversationInspectRequest(BaseModel):
+    asset_id: str = "default"
+    conversation_id: str
+    messages: list[ConversationMessage]
+
 # 裁决结果模型
 class DecisionResult(BaseModel):
     errCode: int = 200
@@ -26,6 +39,14 @@ class DecisionResult(BaseModel):
     suggestion: str
     categories: list[str]
     answer: str = ""
+    spans: list[dict] = []
+
+# 会话裁决结果模型
+# suggestion为redact时，answer 与 spans 的偏移均针对本次新增用户轮次按顺序以换行符("\n")拼接后的文本
+class ConversationDecisionResult(DecisionResult):
+    conversation_id: str
+    inspected_turns: int = 0
+    risk_categories: list[str] = []
 
 # 模型配置请求模型
 class ModelConfigRequest(BaseModel):
@@ -45,7 +66,29 @@ async def inspect_input(request: InputInspectRequest):
         return DecisionResult(
             suggestion=result["suggestion"],
             categories=result["categories"],
-            answer=result.get("answer", "")
+            answer=result.get("answer", ""),
+            spans=result.get("spans", [])
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 会话级增量检测接口
+@router.post("/inspect/conversation", response_model=ConversationDecisionResult)
+async def inspect_conversation(request: ConversationInspectRequest):
+    try:
+        inspector = ConversationInspector(asset_id=request.asset_id)
+        result = await inspector.inspect_conversation(
+            request.conversation_id,
+            [message.model_dump() for message in request.messages]
+        )
+        return ConversationDecisionResult(
+            conversation_id=request.conversation_id,
+            suggestion=result["suggestion"],
+            categories=result["categories"],
+            answer=result.get("answer", ""),
+            spans=result.get("spans", []),
+            inspected_turns=result["inspected_turns"],
+            risk_categories=result["risk_categories"]
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,3 +135,15 @@ async def reload_model_config():
         return {"message": "模型配置已重新加载"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# 获取近似文本裁决缓存指标
+@router.get("/cache/metrics")
+async def get_cache_metrics():
+    try:
+        model_engine = ModelEngine()
+        cache = get_verdict_cache(model_engine.config.get("verdict_cache", {}))
+        if cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **cache.get_metrics()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,130 @@
+import hashlib
+from loguru import logger
+from .input_inspector import InputInspector
+from .session_store import get_session_store
+
+class ConversationInspector(InputInspector):
+    """会话级增量输入检测：仅检测新增轮次，并结合上下文窗口识别跨轮次注入"""
+
+    def __init__(self, asset_id: str = "default"):
+        super().__init__(asset_id)
+        config = self.model_engine.config.get("conversation", {})
+        self.session_store = get_session_store(config)
+        self.context_turns = config.get("context_turns", 4)
+
+    async def inspect_conversation(self, conversation_id: str, messages: list) -> dict:
+        """检测会话中新增轮次的安全性"""
+        # 不同资产的策略不同，会话状态按(资产, 会话)隔离
+        session_key = (self.asset_id, conversation_id)
+        state = self.session_store.get(session_key) or self.session_store.new_state()
+        digests = [self._digest(message) for message in messages]
+        inspected = len(state["turn_digests"])
+
+        # 历史与已检测记录不一致（被编辑）时重新检测全部轮次，但保留累计风险摘要
+        if digests[:inspected] != state["turn_digests"]:
+            logger.warning(f"会话历史与已检测记录不一致，重新检测全部轮次: {conversation_id}")
+            state.update(turn_digests=[], turns=[], last_decision=None)
+            inspected = 0
+
+        new_messages = messages[inspected:]
+        new_text = "\n".join(
+            message.get("content", "") for message in new_messages
+            if message.get("role", "user") == "user" and message.get("content")
+        )
+
+        if not new_text:
+            decision = state["last_decision"] if not new_messages else None
+            decision = decision or self.decision_hub.pass_decision()
+        else:
+            decision = await self._inspect_new_turns(state, new_messages, new_text)
+            self._update_risk(state, decision)
+
+        state["turn_digests"] = digests
+        state["turns"] = (state["turns"] + new_messages)[-self.context_turns:]
+        state["last_decision"] = decision
+        self.session_store.put(session_key, state)
+
+        return {
+            **decision,
+            "inspected_turns": len(new_messages),
+            "risk_categories": list(state["risk_categories"])
+        }
+
+    async def _inspect_new_turns(self, state: dict, new_messages: list, new_text: str) -> dict:
+        """结合上下文窗口检测新增轮次"""
+        # 1. 模型仅检测上下文窗口（最近若干轮 + 新增轮次），避免随会话长度重复检测全部历史
+        # 相邻窗口大部分内容相同，不能复用近似文本裁决，否则新增轮次可能不经模型检测
+        window = state["turns"][-self.context_turns:] + new_messages
+        model_result = await self.model_engine.detect_with_model(
+            self._format_window(state, window), "input", self.asset_id, use_cache=False
+        )
+        if model_result["suggestion"] != "pass" and not self._can_redact(model_result):
+            logger.info(f"模型检测结果: {model_result}")
+            return model_result
+
+        # 2. 规则仅检测新增文本，另外检测跨轮次拼接的指令注入
+        violations, actions, spans = self._check_rules(new_text)
+        if "prompt_injection" not in violations and self.policy_engine.is_rule_enabled("input", "prompt_injection"):
+            rule = self.policy_engine.get_rule("input", "prompt_injection")
+            if self._check_cross_turn_injection(
+                self._join_user_turns(state["turns"][-self.context_turns:]),
+                self._join_user_turns(new_messages),
+                rule
+            ):
+                violations.append("prompt_injection")
+                actions["prompt_injection"] = rule
+
+        if violations:
+            decision = self.decision_hub.generate_decision(violations, actions, new_text, spans)
+            if decision["suggestion"] != "pass":
+                return decision
+
+        if model_result["suggestion"] != "pass":
+            logger.info(f"模型检测结果: {model_result}")
+            return model_result
+
+        return self.decision_hub.pass_decision()
+
+    def _check_cross_turn_injection(self, context_text: str, new_text: str, rule: dict) -> bool:
+        """检测跨轮次拼接的指令注入（关键词需与新增文本重叠，避免已检测的历史重复命中）
+        
+        新增文本由新增用户轮次直接拼接而成，同一请求内多轮拆分的注入同样可以识别。
+        """
+        text = context_text + new_text
+        for keyword in rule.get("keywords", []):
+            if not keyword:
+                continue
+            if text.find(keyword, max(0, len(context_text) - len(keyword) + 1)) != -1:
+                logger.warning(f"规则检测到跨轮次指令注入: {keyword}")
+                return True
+        return False
+
+    def _update_risk(self, state: dict, decision: dict) -> None:
+        """更新会话累计风险摘要"""
+        categories = decision.get("categories", [])
+        if decision.get("suggestion") != "pass":
+            state["flagged_turns"] += 1
+        for category in categories:
+            if category not in state["risk_categories"]:
+                state["risk_categories"].append(category)
+
+    def _format_window(self, state: dict, window: list) -> str:
+        """将上下文窗口格式化为模型检测文本，会话存在违规记录时附带风险摘要以提高警惕"""
+        lines = [f"[{turn.get('role', 'user')}] {turn.get('content', '')}" for turn in window]
+        if state["flagged_turns"] > 0:
+            lines.insert(0, (
+                f"[会话风险摘要] 此前已有{state['flagged_turns']}轮被判定违规，"
+                f"涉及类型: {', '.join(state['risk_categories'])}。请重点检查当前轮次是否延续此前的攻击意图。"
+            ))
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _join_user_turns(turns: list) -> str:
+        """拼接用户轮次内容（不加分隔符，便于识别被拆分到多轮的关键词）"""
+        return "".join(turn.get("content", "") for turn in turns if turn.get("role", "user") == "user")
+
+    @staticmethod
+    def _digest(message: dict) -> str:
+        """计算单轮消息摘要"""
+        content = f"{message.get('role', 'user')}\0{message.get('content', '')}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -1,5 +1,8 @@
 from loguru import logger
 
+# 默认脱敏遮盖模板
+DEFAULT_MASK = "[{type}]"
+
 class DecisionHub:
     def pass_decision(self) -> dict:
         """生成通过裁决"""
@@ -9,11 +12,12 @@ class DecisionHub:
             "answer": ""
         }
     
-    def generate_decision(self, violations: list, actions: dict) -> dict:
+    def generate_decision(self, violations: list, actions: dict, text: str = "", spans: list = None) -> dict:
         """根据违规情况生成裁决结果"""
-        # 确定最终动作（优先级：block > rewrite > pass）
+        # 确定最终动作（优先级：block > rewrite > redact > pass）
         final_action = "pass"
         final_answer = ""
+        mask = DEFAULT_MASK
         
         # 遍历所有违规动作，确定优先级最高的动作
         for violation, action_config in actions.items():
@@ -28,9 +32,27 @@ class DecisionHub:
             elif action == "rewrite" and final_action != "block":
                 final_action = "rewrite"
                 final_answer = answer
-            elif action == "pass" and final_action not in ["block", "rewrite"]:
+            elif action == "redact" and final_action not in ["block", "rewrite"]:
+                final_action = "redact"
+                mask = self._validate_mask(action_config.get("mask", mask))
+            elif action == "pass" and final_action not in ["block", "rewrite", "redact"]:
                 final_action = "pass"
         
+        # 脱敏：代答内容为遮盖敏感片段后的原文，调用方可直接继续后续流程
+        if final_action == "redact":
+            spans = [span for span in spans or [] if span.get("redact", True)]
+            if not spans:
+                logger.info(f"无可遮盖的敏感片段，裁决通过: 违规类型={violations}")
+                return self.pass_decision()
+            final_answer = self.redact(text, spans, mask)
+            logger.info(f"生成裁决结果: 建议=redact, 违规类型={violations}, 脱敏片段数={len(spans)}")
+            return {
+                "suggestion": final_action,
+                "categories": violations,
+                "answer": final_answer,
+                "spans": spans
+            }
+        
         logger.info(f"生成裁决结果: 建议={final_action}, 违规类型={violations}, 代答内容={final_answer}")
         
         return {
@@ -39,6 +61,28 @@ class DecisionHub:
             "answer": final_answer
         }
     
+    def _validate_mask(self, mask) -> str:
+        """校验策略中的遮盖模板，无效时回退为默认模板"""
+        try:
+            str(mask).format(type="sensitive_info")
+            return str(mask)
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"脱敏遮盖模板无效，使用默认模板: {mask}, 错误: {e!r}")
+            return DEFAULT_MASK
+    
+    def redact(self, text: str, spans: list, mask: str = DEFAULT_MASK) -> str:
+        """按片段类型遮盖文本中的敏感信息"""
+        parts = []
+        last = 0
+        for span in sorted(spans, key=lambda s: s["start"]):
+            if span["start"] < last:
+                continue
+            parts.append(text[last:span["start"]])
+            parts.append(mask.format(type=span["type"]))
+            last = span["end"]
+        parts.append(text[last:])
+        return "".join(parts)
+    
     def error_decision(self, error_msg: str) -> dict:
         """生成错误裁决"""
         return {
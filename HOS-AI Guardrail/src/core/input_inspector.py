@@ -17,14 +17,33 @@ class InputInspector:
             return self.decision_hub.pass_decision()
         
         # 1. 首先使用模型进行检测（核心检测）
-        model_result = await self.model_engine.detect_with_model(text, "input")
-        if model_result["suggestion"] != "pass":
+        model_result = await self.model_engine.detect_with_model(text, "input", self.asset_id)
+        if model_result["suggestion"] != "pass" and not self._can_redact(model_result):
             logger.info(f"模型检测结果: {model_result}")
             return model_result
         
         # 2. 模型检测通过后，使用规则检测作为辅助（可选）
+        violations, actions, spans = self._check_rules(text)
+        
+        # 如果规则检测有违规，生成裁决结果（脱敏后无可遮盖片段时裁决为通过）
+        if violations:
+            decision = self.decision_hub.generate_decision(violations, actions, text, spans)
+            if decision["suggestion"] != "pass":
+                return decision
+        
+        # 模型判定为敏感信息但规则未定位到可遮盖片段时，沿用模型裁决
+        if model_result["suggestion"] != "pass":
+            logger.info(f"模型检测结果: {model_result}")
+            return model_result
+        
+        # 无违规，通过
+        return self.decision_hub.pass_decision()
+    
+    def _check_rules(self, text: str) -> tuple:
+        """执行全部启用的规则检测，返回(违规类型, 违规动作, 敏感信息片段)"""
         violations = []
         actions = {}
+        spans = []
         
         # 指令注入检测
         if self.policy_engine.is_rule_enabled("input", "prompt_injection"):
@@ -36,7 +55,8 @@ class InputInspector:
         # 敏感信息检测
         if self.policy_engine.is_rule_enabled("input", "sensitive_info"):
             rule = self.policy_engine.get_rule("input", "sensitive_info")
-            if self._check_sensitive_info(text, rule):
+            spans = self._check_sensitive_info(text, rule)
+            if spans:
                 violations.append("sensitive_info")
                 actions["sensitive_info"] = rule
         
@@ -47,12 +67,16 @@ class InputInspector:
                 violations.append("compliance")
                 actions["compliance"] = rule
         
-        # 如果规则检测有违规，生成裁决结果
-        if violations:
-            return self.decision_hub.generate_decision(violations, actions)
-        
-        # 无违规，通过
-        return self.decision_hub.pass_decision()
+        return violations, actions, spans
+    
+    def _can_redact(self, model_result: dict) -> bool:
+        """模型仅判定为敏感信息且策略配置为脱敏时，交由规则定位片段进行脱敏"""
+        categories = model_result.get("categories", [])
+        if not categories or set(categories) != {"sensitive_info"}:
+            return False
+        if not self.policy_engine.is_rule_enabled("input", "sensitive_info"):
+            return False
+        return self.policy_engine.get_rule("input", "sensitive_info").get("action") == "redact"
     
     def _check_prompt_injection(self, text: str, rule: dict) -> bool:
         """检测指令注入（规则辅助）"""
@@ -63,14 +87,36 @@ class InputInspector:
                 return True
         return False
     
-    def _check_sensitive_info(self, text: str, rule: dict) -> bool:
-        """检测敏感信息（规则辅助）"""
-        patterns = rule.get("patterns", [])
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                logger.warning(f"规则检测到敏感信息: {pattern}")
-                return True
-        return False
+    def _check_sensitive_info(self, text: str, rule: dict) -> list:
+        """检测敏感信息（规则辅助），返回全部命中片段"""
+        # 模式可以是正则字符串，或 {type, pattern, redact} 形式以标注敏感信息类型
+        matches = []
+        for pattern in rule.get("patterns", []):
+            if not isinstance(pattern, dict):
+                pattern = {"pattern": pattern}
+            try:
+                regex = re.compile(pattern.get("pattern", ""), re.IGNORECASE)
+            except re.error as e:
+                logger.error(f"敏感信息规则无效，已跳过: {pattern.get('pattern')}, 错误: {e}")
+                continue
+            for match in regex.finditer(text):
+                if match.end() > match.start():
+                    matches.append((match.start(), match.end(), pattern))
+        
+        # 片段重叠时保留最长的片段（如 13812345678@163.com 整体识别为邮箱）
+        matches.sort(key=lambda m: (m[0] - m[1], m[0]))
+        spans = []
+        for start, end, pattern in matches:
+            if any(start < span["end"] and span["start"] < end for span in spans):
+                continue
+            span = {"type": pattern.get("type", "sensitive_info"), "start": start, "end": end}
+            if pattern.get("redact", True) is False:
+                span["redact"] = False
+            spans.append(span)
+        spans.sort(key=lambda span: span["start"])
+        if spans:
+            logger.warning(f"规则检测到敏感信息: {[span['type'] for span in spans]}")
+        return spans
     
     def _check_compliance(self, text: str, rule: dict) -> bool:
         """检测合规性（规则辅助）"""
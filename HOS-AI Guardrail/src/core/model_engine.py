@@ -3,6 +3,7 @@ import yaml
 import httpx
 from loguru import logger
 from typing import Dict, Any, Optional
+from .verdict_cache import get_verdict_cache
 
 class ModelEngine:
     def __init__(self, config_path: str = None):
@@ -175,8 +176,30 @@ class ModelEngine:
             response.raise_for_status()
             return response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
     
-    async def detect_with_model(self, text: str, detection_type: str) -> Dict[str, Any]:
-        """使用模型进行安全检测"""
+    async def detect_with_model(self, text: str, detection_type: str, asset_id: str = "default",
+                                use_cache: bool = True) -> Dict[str, Any]:
+        """使用模型进行安全检测（近似文本优先复用已缓存裁决）"""
+        cache = get_verdict_cache(self.config.get("verdict_cache", {})) if use_cache else None
+        if cache and not cache.supports(detection_type):
+            cache = None
+        signature = cache.signature(text) if cache else None
+        hit = cache.lookup(asset_id, detection_type, text, signature) if cache else None
+        cached = hit[1] if hit else None
+        if cached and not cache.should_verify():
+            return cached
+        
+        result = await self._detect_with_model(text, detection_type)
+        if result is None:
+            return cached or {"suggestion": "pass", "categories": [], "answer": ""}
+        
+        if cache:
+            if hit:
+                cache.record_verification(hit[0], cached, result)
+            cache.store(asset_id, detection_type, text, signature, result)
+        return result
+    
+    async def _detect_with_model(self, text: str, detection_type: str) -> Optional[Dict[str, Any]]:
+        """调用模型进行安全检测，失败时返回None"""
         system_prompt = """
 你是一个AI安全检测专家，负责检测文本内容的安全性。请根据以下要求进行检测：
 
@@ -203,11 +226,11 @@ class ModelEngine:
         response = await self.call_model(prompt, system_prompt)
         if not response:
             logger.error("模型检测失败，返回空响应")
-            return {"suggestion": "pass", "categories": [], "answer": ""}
+            return None
         
         try:
             import json
             return json.loads(response.strip())
         except Exception as e:
             logger.error(f"解析模型检测结果失败: {e}, 响应内容: {response}")
-            return {"suggestion": "pass", "categories": [], "answer": ""}
+            return None
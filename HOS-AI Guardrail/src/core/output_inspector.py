@@ -16,7 +16,7 @@ class OutputInspector:
             return self.decision_hub.pass_decision()
         
         # 1. 首先使用模型进行检测（核心检测）
-        model_result = await self.model_engine.detect_with_model(text, "output")
+        model_result = await self.model_engine.detect_with_model(text, "output", self.asset_id)
         if model_result["suggestion"] != "pass":
             logger.info(f"模型检测结果: {model_result}")
             return model_result
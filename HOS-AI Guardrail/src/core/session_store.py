@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from loguru import logger
+from typing import Dict, Any, Hashable, Optional
+
+class SessionStore:
+    """会话状态存储（容量有限，按TTL过期并按LRU淘汰）"""
+
+    def __init__(self, max_sessions: int = 1000, ttl: int = 1800):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        # 会话键 -> (最后访问时间, 会话状态)
+        self.sessions: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def new_state(self) -> Dict[str, Any]:
+        """创建空的会话状态"""
+        return {
+            "turn_digests": [],       # 已检测轮次的内容摘要，用于校验历史是否一致
+            "turns": [],              # 最近的对话轮次，作为模型检测的上下文窗口
+            "risk_categories": [],    # 会话累计出现过的违规类型
+            "flagged_turns": 0,       # 会话中被判定为违规的轮次数
+            "last_decision": None     # 最近一次裁决结果
+        }
+
+    def get(self, session_key: Hashable) -> Optional[Dict[str, Any]]:
+        """获取会话状态，已过期或不存在时返回None"""
+        item = self.sessions.get(session_key)
+        if item is None:
+            return None
+        accessed_at, state = item
+        if time.monotonic() - accessed_at > self.ttl:
+            del self.sessions[session_key]
+            logger.info(f"会话状态已过期: {session_key}")
+            return None
+        return state
+
+    def put(self, session_key: Hashable, state: Dict[str, Any]) -> None:
+        """保存会话状态并刷新访问时间"""
+        self.sessions[session_key] = (time.monotonic(), state)
+        self.sessions.move_to_end(session_key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """清理过期会话，并在超出容量时淘汰最久未访问的会话"""
+        now = time.monotonic()
+        while self.sessions:
+            session_key, (accessed_at, _) = next(iter(self.sessions.items()))
+            if now - accessed_at <= self.ttl and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[session_key]
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+
+# 进程内共享的会话存储实例
+_session_store: Optional[SessionStore] = None
+
+def get_session_store(config: Dict[str, Any] = None) -> SessionStore:
+    """获取共享的会话存储实例"""
+    global _session_store
+    config = config or {}
+    if _session_store is None:
+        _session_store = SessionStore(
+            max_sessions=config.get("max_sessions", 1000),
+            ttl=config.get("ttl", 1800)
+        )
+        logger.info("会话状态存储已初始化")
+    return _session_store
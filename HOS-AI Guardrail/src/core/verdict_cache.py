@@ -0,0 +1,224 @@
+import re
+import random
+import hashlib
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from loguru import logger
+from typing import Dict, Any, Optional, Tuple
+
+class VerdictCache:
+    """近似重复文本裁决缓存（基于MinHash的局部敏感索引）"""
+
+    # 可复用的裁决类型
+    REUSABLE_SUGGESTIONS = ("pass", "block")
+
+    def __init__(self, max_size: int = 1000, threshold: float = 0.8, num_perm: int = 128, bands: int = 32,
+                 ngram: int = 3, min_length: int = 10, max_span_tokens: int = 6, max_diff_tokens: int = 12,
+                 detection_types: tuple = ("input",), verify_sample_rate: float = 0.0):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.max_span_tokens = max_span_tokens
+        self.max_diff_tokens = max_diff_tokens
+        self.detection_types = tuple(detection_types)
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.min_length = min_length
+        self.verify_sample_rate = verify_sample_rate
+        # 签名切分为 bands 段，任意一段完全相同即为候选，再按估计的Jaccard相似度过滤
+        self.rows = max(1, num_perm // max(1, bands))
+        # 缓存条目：(asset_id, detection_type, signature) -> {"verdict": 裁决结果, "text": 归一化文本}，按LRU顺序排列
+        self.entries: "OrderedDict[Tuple[str, str, tuple], Dict[str, Any]]" = OrderedDict()
+        # 分段索引：(asset_id, detection_type, 段序号, 段值) -> 签名集合
+        self.index: Dict[Tuple[str, str, int, tuple], set] = {}
+        self.metrics = {
+            "lookups": 0,
+            "hits": 0,
+            "stores": 0,
+            "evictions": 0,
+            "verifications": 0,
+            "disagreements": 0
+        }
+
+    def _normalize(self, text: str) -> str:
+        """归一化文本：数字统一替换、空白压缩、忽略大小写"""
+        text = text.lower()
+        text = re.sub(r"\d+", "0", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def supports(self, detection_type: str) -> bool:
+        """检测类型是否允许复用裁决（仅限有规则兜底敏感信息检测的类型）"""
+        return detection_type in self.detection_types
+
+    def signature(self, text: str) -> Optional[tuple]:
+        """计算文本字符n-gram集合的MinHash签名，文本过短时返回None"""
+        text = self._normalize(text)
+        if len(text) < self.min_length:
+            return None
+
+        # 单次哈希MinHash：每个n-gram只哈希一次，按哈希值分桶并取桶内最小值
+        bins = [None] * self.num_perm
+        for shingle in {text[i:i + self.ngram] for i in range(max(1, len(text) - self.ngram + 1))}:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            i = value % self.num_perm
+            value //= self.num_perm
+            if bins[i] is None or value < bins[i]:
+                bins[i] = value
+
+        # 空桶借用右侧最近非空桶的值并按距离偏移，保证签名各位都可比较
+        offset = (1 << 64) // self.num_perm
+        result = list(bins)
+        for i in range(self.num_perm):
+            if bins[i] is None:
+                distance = 1
+                while bins[(i + distance) % self.num_perm] is None:
+                    distance += 1
+                result[i] = bins[(i + distance) % self.num_perm] + distance * offset
+        return tuple(result)
+
+    def similarity(self, a: tuple, b: tuple) -> float:
+        """根据签名估计两段文本的Jaccard相似度"""
+        return sum(x == y for x, y in zip(a, b)) / self.num_perm
+
+    def is_variant(self, cached_text: str, text: str) -> bool:
+        """判断两段归一化文本是否仅在少量可变词元（姓名、日期等）上被替换
+
+        只允许替换：纯插入或删除（如在模板后追加指令）一律不复用，
+        且每处替换和替换总量都不得超过词元数上限。
+        """
+        a = re.findall(r"[a-z]+|.", cached_text, re.S)
+        b = re.findall(r"[a-z]+|.", text, re.S)
+        changed = 0
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+            if tag == "equal":
+                continue
+            if tag != "replace" or i2 - i1 > self.max_span_tokens or j2 - j1 > self.max_span_tokens:
+                return False
+            changed += j2 - j1
+            if changed > self.max_diff_tokens:
+                return False
+        return True
+
+    def _band_keys(self, asset_id: str, detection_type: str, signature: tuple) -> list:
+        """获取签名对应的全部分段索引键"""
+        return [
+            (asset_id, detection_type, i, signature[start:start + self.rows])
+            for i, start in enumerate(range(0, self.num_perm, self.rows))
+        ]
+
+    def lookup(self, asset_id: str, detection_type: str, text: str, signature: Optional[tuple]) -> Optional[tuple]:
+        """查找近似文本的已缓存裁决，命中时返回(条目键, 裁决结果)"""
+        if signature is None or not self.supports(detection_type):
+            return None
+
+        self.metrics["lookups"] += 1
+        candidates = {}
+        for band_key in self._band_keys(asset_id, detection_type, signature):
+            for candidate in self.index.get(band_key, ()):
+                if candidate not in candidates:
+                    candidates[candidate] = self.similarity(candidate, signature)
+
+        # 相似度达到阈值后，还需确认差异仅为少量可变词元的替换
+        text = self._normalize(text)
+        for candidate, similarity in sorted(candidates.items(), key=lambda item: -item[1]):
+            if similarity < self.threshold:
+                break
+            key = (asset_id, detection_type, candidate)
+            if not self.is_variant(self.entries[key]["text"], text):
+                continue
+            self.entries.move_to_end(key)
+            self.metrics["hits"] += 1
+            logger.info(f"复用近似文本裁决: 资产={asset_id}, 类型={detection_type}, 相似度={similarity:.2f}")
+            return key, dict(self.entries[key]["verdict"])
+        return None
+
+    def store(self, asset_id: str, detection_type: str, text: str, signature: Optional[tuple],
+              verdict: Dict[str, Any]) -> None:
+        """缓存模型裁决结果（仅缓存pass/block，且不缓存敏感信息类裁决）"""
+        if signature is None or not self.supports(detection_type):
+            return
+        if verdict.get("suggestion") not in self.REUSABLE_SUGGESTIONS:
+            return
+        # 敏感信息取决于具体的号码、姓名，必须每次重新检测
+        if "sensitive_info" in verdict.get("categories", []):
+            return
+
+        key = (asset_id, detection_type, signature)
+        if key not in self.entries:
+            for band_key in self._band_keys(asset_id, detection_type, signature):
+                self.index.setdefault(band_key, set()).add(signature)
+        self.entries[key] = {"verdict": dict(verdict), "text": self._normalize(text)}
+        self.entries.move_to_end(key)
+        self.metrics["stores"] += 1
+
+        while len(self.entries) > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目"""
+        self._remove(next(iter(self.entries)))
+        self.metrics["evictions"] += 1
+
+    def _remove(self, key: Tuple[str, str, tuple]) -> None:
+        """删除条目及其分段索引"""
+        if self.entries.pop(key, None) is None:
+            return
+        asset_id, detection_type, signature = key
+        for band_key in self._band_keys(asset_id, detection_type, signature):
+            bucket = self.index.get(band_key)
+            if bucket is not None:
+                bucket.discard(signature)
+                if not bucket:
+                    del self.index[band_key]
+
+    def should_verify(self) -> bool:
+        """按采样率决定是否对复用裁决进行模型复核"""
+        return self.verify_sample_rate > 0 and random.random() < self.verify_sample_rate
+
+    def record_verification(self, key: Tuple[str, str, tuple], cached: Dict[str, Any], actual: Dict[str, Any]) -> None:
+        """记录复核结果，复用裁决与模型裁决不一致时淘汰该条目"""
+        self.metrics["verifications"] += 1
+        if cached.get("suggestion") != actual.get("suggestion"):
+            self.metrics["disagreements"] += 1
+            self._remove(key)
+            logger.warning(f"复用裁决与模型复核结果不一致，已淘汰缓存条目: 缓存={cached}, 模型={actual}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取缓存统计指标"""
+        metrics = dict(self.metrics)
+        metrics["size"] = len(self.entries)
+        metrics["reuse_rate"] = metrics["hits"] / metrics["lookups"] if metrics["lookups"] else 0.0
+        metrics["disagreement_rate"] = (
+            metrics["disagreements"] / metrics["verifications"] if metrics["verifications"] else 0.0
+        )
+        return metrics
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.entries.clear()
+        self.index.clear()
+
+
+# 进程内共享的缓存实例（检测器按请求创建，缓存需跨请求保留）
+_verdict_cache: Optional[VerdictCache] = None
+
+def get_verdict_cache(config: Dict[str, Any] = None) -> Optional[VerdictCache]:
+    """获取共享的裁决缓存实例，未启用时返回None"""
+    global _verdict_cache
+    config = config or {}
+    if not config.get("enabled", False):
+        return None
+    if _verdict_cache is None:
+        _verdict_cache = VerdictCache(
+            max_size=config.get("max_size", 1000),
+            threshold=config.get("threshold", 0.8),
+            num_perm=config.get("num_perm", 128),
+            bands=config.get("bands", 32),
+            ngram=config.get("ngram", 3),
+            min_length=config.get("min_length", 10),
+            max_span_tokens=config.get("max_span_tokens", 6),
+            max_diff_tokens=config.get("max_diff_tokens", 12),
+            detection_types=config.get("detection_types", ["input"]),
+            verify_sample_rate=config.get("verify_sample_rate", 0.0)
+        )
+        logger.info("近似文本裁决缓存已初始化")
+    return _verdict_cache
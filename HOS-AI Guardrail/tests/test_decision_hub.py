@@ -0,0 +1,54 @@
+from src.core.decision_hub import DecisionHub
+
+class TestDecisionHub:
+    def test_block_priority(self):
+        """测试拦截优先级最高"""
+        hub = DecisionHub()
+        result = hub.generate_decision(
+            ["prompt_injection", "sensitive_info"],
+            {
+                "prompt_injection": {"action": "block", "answer": "拦截"},
+                "sensitive_info": {"action": "redact"}
+            }
+        )
+        
+        assert result["suggestion"] == "block"
+        assert result["answer"] == "拦截"
+    
+    def test_redact_decision(self):
+        """测试脱敏裁决返回遮盖后的原文"""
+        hub = DecisionHub()
+        text = "我的手机号是13812345678"
+        spans = [{"type": "phone", "start": 6, "end": 17}]
+        result = hub.generate_decision(["sensitive_info"], {"sensitive_info": {"action": "redact"}}, text, spans)
+        
+        assert result["suggestion"] == "redact"
+        assert result["categories"] == ["sensitive_info"]
+        assert result["answer"] == "我的手机号是[phone]"
+        assert result["spans"] == spans
+    
+    def test_redact_invalid_mask(self):
+        """测试无效遮盖模板回退为默认模板"""
+        hub = DecisionHub()
+        spans = [{"type": "phone", "start": 6, "end": 17}]
+        result = hub.generate_decision(
+            ["sensitive_info"], {"sensitive_info": {"action": "redact", "mask": "<{}>"}}, "我的手机号是13812345678", spans
+        )
+        
+        assert result["answer"] == "我的手机号是[phone]"
+    
+    def test_redact_without_maskable_spans(self):
+        """测试仅命中不遮盖的关键词时裁决通过"""
+        hub = DecisionHub()
+        spans = [{"type": "keyword", "start": 2, "end": 5, "redact": False}]
+        result = hub.generate_decision(["sensitive_info"], {"sensitive_info": {"action": "redact"}}, "请问手机号怎么填", spans)
+        
+        assert result["suggestion"] == "pass"
+        assert result["categories"] == []
+    
+    def test_redact_overlapping_spans(self):
+        """测试重叠片段只遮盖一次"""
+        hub = DecisionHub()
+        spans = [{"type": "id_card", "start": 0, "end": 18}, {"type": "phone", "start": 2, "end": 13}]
+        
+        assert hub.redact("110101199001011234号", spans, "***") == "***号"
@@ -52,6 +52,35 @@ class TestInputInspector:
         assert "compliance" in result["categories"]
         assert "抱歉，您的请求涉及违规内容，无法处理。" in result["answer"]
     
+    def test_sensitive_info_spans(self):
+        """测试敏感信息片段定位"""
+        inspector = InputInspector("default")
+        rule = inspector.policy_engine.get_rule("input", "sensitive_info")
+        text = "我的手机号是13812345678，邮箱test@example.com"
+        spans = inspector._check_sensitive_info(text, rule)
+        
+        types = [span["type"] for span in spans]
+        assert "phone" in types
+        assert "email" in types
+        phone = next(span for span in spans if span["type"] == "phone")
+        assert text[phone["start"]:phone["end"]] == "13812345678"
+    
+    def test_sensitive_info_longest_span(self):
+        """测试重叠片段取最长匹配"""
+        inspector = InputInspector("default")
+        rule = inspector.policy_engine.get_rule("input", "sensitive_info")
+        spans = inspector._check_sensitive_info("联系我13812345678@163.com", rule)
+        
+        assert spans == [{"type": "email", "start": 3, "end": 22}]
+    
+    def test_sensitive_info_invalid_pattern(self):
+        """测试无效正则被跳过且不影响其他模式"""
+        inspector = InputInspector("default")
+        rule = {"patterns": [r"(?P<p0>\d)(", {"type": "repeat", "pattern": r"(\d)\1{3}"}]}
+        spans = inspector._check_sensitive_info("密码是8888", rule)
+        
+        assert spans == [{"type": "repeat", "start": 3, "end": 7}]
+    
     @pytest.mark.asyncio
     async def test_empty_input(self):
         """测试空输入"""